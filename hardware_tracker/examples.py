@@ -150,6 +150,11 @@ def example_database_query():
         
         try:
             conn = sqlite3.connect(db_path)
+            # Same tuning as DatabaseStoragePipeline: WAL lets us read while a
+            # crawl is writing, mmap and a bigger cache speed up the scans
+            for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY",
+                           "mmap_size=268435456", "cache_size=-65536"):
+                conn.execute(f"PRAGMA {pragma}")
             cursor = conn.cursor()
             
             # Check if tables exist
@@ -170,9 +175,9 @@ def example_database_query():
                 for row in cursor.fetchall():
                     print(f"  {row[0]} | {row[1]} | ${row[2]} | {row[3]} | {row[4]}")
                 
-                # Get statistics
+                # Get statistics (aggregated by SQLite over the category/price index)
                 cursor.execute("""
-                    SELECT category, COUNT(*), AVG(price)
+                    SELECT category, COUNT(*), AVG(price), MIN(price), MAX(price)
                     FROM hardware_items 
                     WHERE price IS NOT NULL
                     GROUP BY category
@@ -180,7 +185,29 @@ def example_database_query():
                 
                 print("\nStatistics by category:")
                 for row in cursor.fetchall():
-                    print(f"  {row[0]}: {row[1]} items, avg price: ${row[2]:.2f}")
+                    print(f"  {row[0]}: {row[1]} items, avg price: ${row[2]:.2f} "
+                          f"(${row[3]:.2f} - ${row[4]:.2f})")
+                
+                # Rank prices within each category in SQL instead of loading
+                # every row into Python; stream the result in chunks
+                cursor.arraysize = 1000
+                cursor.execute("""
+                    SELECT category, name, price FROM (
+                        SELECT category, name, price,
+                               RANK() OVER (PARTITION BY category ORDER BY price) AS price_rank
+                        FROM hardware_items
+                        WHERE price IS NOT NULL
+                    )
+                    WHERE price_rank = 1
+                """)
+                
+                print("\nBest price by category:")
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for row in rows:
+                        print(f"  {row[0]}: {row[1]} at ${row[2]:.2f}")
             
             else:
                 print("No data found. Run a spider to populate the database.")
@@ -237,7 +264,7 @@ def demonstrate_ethical_scraping():
     print(f"  Sample user agent: {middleware.user_agents[0][:60]}...")
     
     print("\nRate Limiting:")
-    print(f"  Domain delays: {list(middleware.domain_delays.keys())[:3]}...")
+    print(f"  Throttled domains: {list(middleware.states.keys())[:3]}...")
     
     print("\nRobots.txt Compliance:")
     print("  All spiders respect robots.txt by default")
@@ -0,0 +1,29 @@
+# Define here your custom feed exporters
+#
+# Don't forget to register them in the FEED_EXPORTERS setting
+# See: https://docs.scrapy.org/en/latest/topics/feed-exports.html
+
+from scrapy.exporters import JsonLinesItemExporter
+
+try:
+    import msgspec
+except ImportError:  # Optional speed-up, see requirements.txt
+    msgspec = None
+
+
+class FastJsonLinesItemExporter(JsonLinesItemExporter):
+    """JSON lines exporter that encodes items with msgspec when it is installed"""
+    
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        # Fall back to str() for anything msgspec can't encode natively,
+        # mirroring the default=str used by our own JSON exports
+        self.fast_encoder = msgspec.json.Encoder(enc_hook=str) if msgspec else None
+    
+    def export_item(self, item):
+        """Encode straight to UTF-8 bytes, skipping the stdlib json round-trip"""
+        if self.fast_encoder is None:
+            return super().export_item(item)
+        
+        itemdict = dict(self._get_serialized_fields(item))
+        self.file.write(self.fast_encoder.encode(itemdict) + b"\n")
@@ -3,9 +3,14 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import asyncio
+import itertools
 import random
+import sys
 import time
 import logging
+import tldextract
+from collections import defaultdict
 from scrapy import signals
 from scrapy.exceptions import IgnoreRequest
 from urllib.parse import urlparse
@@ -13,13 +18,13 @@ from urllib.parse import urlparse
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+logger = logging.getLogger(__name__)
+
 
 class EthicalSpiderMiddleware:
     """Middleware for ethical scraping practices"""
     
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        
         # User agent rotation for realistic browsing
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -46,36 +51,95 @@ class EthicalSpiderMiddleware:
 
     def process_spider_input(self, response, spider):
         """Validate response and add metadata"""
-        response.meta['scraped_at'] = time.time()
-        response.meta['crawl_id'] = getattr(spider, 'crawl_id', None)
+        meta = response.meta
+        meta['scraped_at'] = time.time()
+        meta['crawl_id'] = getattr(spider, 'crawl_id', None)
         return None
 
     def process_spider_output(self, response, result, spider):
         """Process spider output with rate limiting awareness"""
-        domain = urlparse(response.url).netloc
-        if domain in self.domain_delays:
-            delay = self.domain_delays[domain]
-            self.logger.info(f"Rate limiting for {domain}: {delay}s delay")
-        
-        for i in result:
-            yield i
+        self.log_rate_limit(response)
+        # Nothing to transform: hand the spider output straight back
+        return result
+
+    async def process_spider_output_async(self, response, result, spider):
+        """Same for asynchronous spider output (required by Scrapy >= 2.13)"""
+        self.log_rate_limit(response)
+        async for r in result:
+            yield r
+
+    def log_rate_limit(self, response):
+        """Log the domain's configured delay when debugging"""
+        # Runs once per response, so keep it off the hot path unless debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            # Populated once per request by EthicalDownloaderMiddleware
+            domain = response.meta.get('domain_key')
+            if domain in self.domain_delays:
+                delay = self.domain_delays[domain]
+                logger.debug("Rate limiting for %s: %ss delay", domain, delay)
 
     def process_spider_exception(self, response, exception, spider):
         """Handle spider exceptions with logging"""
-        self.logger.error(f"Spider exception for {response.url}: {exception}")
+        logger.error("Spider exception for %s: %s", response.url, exception)
         return None
 
     def spider_opened(self, spider):
-        self.logger.info(f"Ethical spider middleware opened for: {spider.name}")
-        self.logger.info("Respectful scraping practices enabled")
+        logger.info("Ethical spider middleware opened for: %s", spider.name)
+        logger.info("Respectful scraping practices enabled")
+
+
+class ThrottleState:
+    """Adaptive per-domain throttle state.
+
+    Tracks an EMA of response latency and backs off multiplicatively when the
+    server signals rate limiting, then recovers additively towards the
+    configured base delay on successful responses. All timestamps are
+    time.monotonic() seconds.
+    """
+    
+    ALPHA = 0.3              # EMA smoothing factor for latency
+    BACKOFF_FACTOR = 1.5     # min_delay multiplier on 429/503
+    RECOVERY_STEP = 0.1      # Seconds shaved off min_delay per good response
+    MAX_DELAY = 60.0         # Never wait longer than this between requests
+    
+    def __init__(self, base_delay):
+        self.base_delay = base_delay
+        self.min_delay = base_delay
+        self.last_request = 0.0
+        self.avg_latency_ms = None
+        self.rate_limit_count = 0
+        self.paused_until = 0.0
+    
+    def current_delay(self):
+        """Delay between requests: never faster than the server answers"""
+        latency = (self.avg_latency_ms or 0.0) / 1000.0
+        return min(self.MAX_DELAY, max(self.min_delay, latency))
+    
+    def time_until_next(self, now):
+        """Reserve the next request slot and return how long to wait for it"""
+        next_time = max(now, self.last_request + self.current_delay(), self.paused_until)
+        self.last_request = next_time
+        return next_time - now
+    
+    def update_latency(self, latency_ms):
+        """Fold a successful response latency into the EMA and recover speed"""
+        if self.avg_latency_ms is None:
+            self.avg_latency_ms = latency_ms
+        else:
+            self.avg_latency_ms = self.ALPHA * latency_ms + (1 - self.ALPHA) * self.avg_latency_ms
+        self.min_delay = max(self.base_delay, self.min_delay - self.RECOVERY_STEP)
+    
+    def signal_rate_limit(self, pause, now):
+        """Back off after a rate-limit response and pause the domain"""
+        self.rate_limit_count += 1
+        self.min_delay = min(self.MAX_DELAY, max(self.min_delay, 1.0) * self.BACKOFF_FACTOR)
+        self.paused_until = max(self.paused_until, now + pause)
 
 
 class EthicalDownloaderMiddleware:
     """Middleware for ethical web scraping with user agent rotation and rate limiting"""
     
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        
         # User agent rotation
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -85,17 +149,51 @@ class EthicalDownloaderMiddleware:
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
         ]
         
-        # Domain-specific delays
-        self.domain_delays = {
+        # Adaptive throttle state per domain, seeded with base delays
+        base_delays = {
             'amazon.com': 3,
             'newegg.com': 2,
             'microcenter.com': 2,
             'bestbuy.com': 2,
             'walmart.com': 3,
         }
+        self.states = {sys.intern(domain): ThrottleState(delay) for domain, delay in base_delays.items()}
+        
+        self.request_counts = defaultdict(int)
+        
+        # Registrable-domain extraction (www.amazon.com -> amazon.com) using the
+        # bundled public suffix snapshot: no network fetch, no disk cache
+        self._extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+        self._domain_keys = {}
+        
+        # Precomputed per-request header values
+        self._uas = tuple(dict.fromkeys(self.user_agents))
+        self._n_uas = len(self._uas)
+        self._base_headers = (
+            ('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'),
+            ('Accept-Language', 'en-US,en;q=0.5'),
+            ('Connection', 'keep-alive'),
+        )
         
-        self.last_request_times = {}
-        self.request_counts = {}
+        # User agent policy per registrable domain: 'cycle' (cheap round-robin)
+        # unless the site is known to fingerprint agent sequences
+        self.ua_policies = {
+            'amazon.com': 'random',
+            'walmart.com': 'random',
+        }
+        self._ua_cycle = itertools.cycle(self._uas)
+        self._random = random.Random()
+
+    def domain_key(self, netloc):
+        """Map a netloc to its registrable domain, memoized per netloc"""
+        key = self._domain_keys.get(netloc)
+        if key is None:
+            ext = self._extract(netloc)
+            key = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
+            # Interned keys are the very objects stored in states/request_counts,
+            # so every per-request dict lookup matches on identity
+            key = self._domain_keys[netloc] = sys.intern(key)
+        return key
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -103,61 +201,90 @@ class EthicalDownloaderMiddleware:
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
-    def process_request(self, request, spider):
+    async def process_request(self, request, spider):
         """Process each request with ethical scraping practices"""
+        headers = request.headers
+        meta = request.meta
+        # Monotonic clock: immune to NTP slews, read once per call
+        now = time.monotonic()
+        
+        # Parsed here once per download attempt (redirects copy meta, so never
+        # trust a stale value) and reused by process_response, process_exception
+        # and the spider middleware
+        domain = meta['domain'] = urlparse(request.url).netloc
+        # Throttle on the registrable domain so subdomains share one budget
+        key = meta['domain_key'] = self.domain_key(domain)
+        
         # Rotate user agent
-        user_agent = random.choice(self.user_agents)
-        request.headers['User-Agent'] = user_agent
+        if self.ua_policies.get(key) == 'random':
+            headers['User-Agent'] = self._uas[self._random.randrange(self._n_uas)]
+        else:
+            headers['User-Agent'] = next(self._ua_cycle)
         
-        # Add polite headers
-        request.headers['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-        request.headers['Accept-Language'] = 'en-US,en;q=0.5'
-        request.headers['Connection'] = 'keep-alive'
+        # Add polite headers (without clobbering ones the spider set)
+        for name, value in self._base_headers:
+            headers.setdefault(name, value)
         
         # Rate limiting per domain
-        domain = urlparse(request.url).netloc
+        meta['start_time_mono'] = now
         
-        if domain in self.domain_delays:
-            current_time = time.time()
-            last_time = self.last_request_times.get(domain, 0)
-            delay = self.domain_delays[domain]
-            
-            if current_time - last_time < delay:
-                sleep_time = delay - (current_time - last_time)
-                time.sleep(sleep_time)
-                self.logger.debug(f"Applied {sleep_time:.2f}s delay for {domain}")
+        state = self.states.get(key)
+        if state is not None:
+            self.request_counts[key] += 1
             
-            self.last_request_times[domain] = time.time()
-            self.request_counts[domain] = self.request_counts.get(domain, 0) + 1
+            # Reserve the next slot for this domain before waiting, so concurrent
+            # requests queue up behind each other instead of firing together
+            sleep_time = state.time_until_next(now)
+            if sleep_time > 0:
+                meta['start_time_mono'] = now + sleep_time
+                logger.debug("Applied %.2fs delay for %s", sleep_time, domain)
+                # Non-blocking delay: the asyncio reactor (TWISTED_REACTOR) keeps
+                # serving other domains while this request waits
+                await asyncio.sleep(sleep_time)
         
         return None
 
     def process_response(self, request, response, spider):
         """Process response with error handling"""
-        domain = urlparse(request.url).netloc
+        # Work on request.meta: the engine only ties response.request (and so
+        # response.meta) to the request after the middleware chain has run
+        meta = request.meta
+        status = response.status
+        domain = meta['domain']
+        key = meta['domain_key']
+        now = time.monotonic()
+        
+        # Time since the request left the throttle (start_time_mono is set in process_request)
+        response_time = meta['response_time'] = now - meta.get('start_time_mono', now)
         
         # Handle different response codes
-        if response.status == 429:  # Too Many Requests
-            self.logger.warning(f"Rate limit hit for {domain}. Adding extra delay.")
-            time.sleep(10)
+        if status in (429, 503):  # Too Many Requests / Service Unavailable
+            logger.warning("Rate limit hit for %s. Backing off.", domain)
+            # Pause the domain instead of sleeping in the reactor
+            state = self.states.setdefault(key, ThrottleState(0))
+            state.signal_rate_limit(10, now)
         
-        elif response.status == 403:  # Forbidden
-            self.logger.error(f"Access forbidden for {domain}. Check robots.txt and terms.")
+        elif status == 403:  # Forbidden
+            logger.error("Access forbidden for %s. Check robots.txt and terms.", domain)
         
-        elif response.status >= 500:  # Server Error
-            self.logger.warning(f"Server error {response.status} for {domain}")
+        elif status >= 500:  # Server Error
+            logger.warning("Server error %s for %s", status, domain)
         
-        response.meta['response_time'] = time.time() - request.meta.get('start_time', time.time())
-        response.meta['domain'] = domain
+        else:
+            state = self.states.get(key)
+            if state is not None:
+                # Prefer Scrapy's own download latency over our coarse timer
+                latency = meta.get('download_latency', response_time)
+                state.update_latency(latency * 1000)
         
         return response
 
     def process_exception(self, request, exception, spider):
         """Handle downloader exceptions gracefully"""
-        domain = urlparse(request.url).netloc
-        self.logger.error(f"Downloader exception for {domain}: {exception}")
+        domain = request.meta.get('domain')
+        logger.error("Downloader exception for %s: %s", domain, exception)
         return None
 
     def spider_opened(self, spider):
-        self.logger.info(f"Ethical downloader middleware opened for: {spider.name}")
-        self.logger.info("Ethical scraping practices active")
+        logger.info("Ethical downloader middleware opened for: %s", spider.name)
+        logger.info("Ethical scraping practices active")
@@ -3,39 +3,175 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import os
+import re
 import json
 import csv
 import sqlite3
 import logging
+import queue
+import threading
 from datetime import datetime
-from urllib.parse import urlparse
-from decimal import Decimal
 from itemadapter import ItemAdapter
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up, see requirements.txt
+    orjson = None
+
+
+if orjson is not None:
+    def _dumps(value):
+        """Serialize a nested item field to a JSON string (orjson, C-accelerated)"""
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def _dumps_export(value):
+        """Serialize an exported item to indented UTF-8 JSON bytes (orjson)"""
+        return orjson.dumps(value, default=str,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+else:
+    def _dumps(value):
+        """Serialize a nested item field to a JSON string (stdlib fallback)"""
+        return json.dumps(value, default=str)
+    
+    def _dumps_export(value):
+        """Serialize an exported item to indented UTF-8 JSON bytes (stdlib fallback)"""
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+
+
+# Run on the price text after thousands separators have been stripped
+_PRICE_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Item fields holding lists/dicts, stored and exported as JSON text
+_JSON_FIELDS = frozenset((
+    'specifications', 'key_features', 'image_urls', 'tags', 'validation_errors',
+    'price_history', 'specifications_table',
+))
+
+# Columns written to hardware_items, in table order (id and the
+# created_at/updated_at timestamps are managed by SQLite)
+HARDWARE_COLUMNS = (
+    'name', 'brand', 'model', 'category', 'price', 'currency',
+    'availability_status', 'specifications', 'key_features', 'image_urls',
+    'primary_image', 'description', 'rating', 'review_count', 'source_url',
+    'source_domain', 'scraped_timestamp', 'spider_name', 'crawl_id', 'tags',
+    'is_complete', 'data_quality_score', 'validation_errors',
+)
+
+
+def _upsert_sql(columns):
+    """One statement per row: insert new URLs, refresh existing ones in place.
+    
+    Fields missing from a re-scrape bind NULL, which keeps the stored value.
+    """
+    return (
+        f"INSERT INTO hardware_items ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT(source_url) DO UPDATE SET "
+        f"{', '.join(f'{c} = COALESCE(excluded.{c}, hardware_items.{c})' for c in columns)}, "
+        f"updated_at = CURRENT_TIMESTAMP"
+    )
+
+
+_LOOKUP_IDS_SQL = '''
+    SELECT source_url, id FROM hardware_items
+    WHERE source_url IN (SELECT value FROM json_each(?))
+'''
+# SQLite returns the bare price column from the row holding MAX(timestamp)
+_LAST_PRICES_SQL = '''
+    SELECT product_id, price, MAX(timestamp) FROM price_history 
+    WHERE product_id IN (SELECT value FROM json_each(?)) 
+    GROUP BY product_id
+'''
+_INSERT_PRICE_SQL = '''
+    INSERT INTO price_history 
+    (product_id, price, currency, timestamp, source_url, availability_status)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Queued by close_spider to stop the writer thread once the queue is drained
+_STOP = object()
+
 
 class DatabaseStoragePipeline:
     """Pipeline for storing items in SQLite database"""
     
-    def __init__(self, database_url=None):
+    # Tuning applied on every connection, each overridable via the DB_* settings
+    DEFAULT_PRAGMAS = {
+        # WAL only needs NORMAL sync to stay crash-safe; FULL fsyncs every commit
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'mmap_size': 268435456,      # 256 MB memory-mapped I/O
+        'cache_size': -65536,        # 64 MB page cache
+        'wal_autocheckpoint': 1000,  # pages
+    }
+    
+    def __init__(self, database_url=None, batch_size=500, pragmas=None, queue_size=2000):
         self.database_url = database_url or 'hardware_data.db'
+        self.batch_size = batch_size
+        self.pragmas = {**self.DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.queue_size = queue_size
         self.logger = logging.getLogger(__name__)
+        # Last stored price per product id, so unchanged prices skip the database
+        self._last_price = {}
     
     @classmethod
     def from_crawler(cls, crawler):
-        return cls(database_url=crawler.settings.get('DATABASE_URL'))
+        return cls(
+            database_url=crawler.settings.get('DATABASE_URL'),
+            batch_size=crawler.settings.getint('DB_BATCH_SIZE', 500),
+            queue_size=crawler.settings.getint('DB_QUEUE_SIZE', 2000),
+            pragmas={
+                name: crawler.settings.get(f'DB_{name.upper()}', default)
+                for name, default in cls.DEFAULT_PRAGMAS.items()
+            },
+        )
     
     def open_spider(self, spider):
         """Initialize database connection with WAL mode for concurrent access"""
-        self.conn = sqlite3.connect(self.database_url, timeout=30.0)
+        # Set up here, then used only by the writer thread until close_spider
+        self.conn = sqlite3.connect(self.database_url, timeout=30.0, check_same_thread=False)
         # Enable WAL mode for better concurrent access (crucial for AllHardwareSpider)
         self.conn.execute("PRAGMA journal_mode=WAL")
         self.conn.execute("PRAGMA busy_timeout=30000")  # 30 second timeout
+        for name, value in self.pragmas.items():
+            self.conn.execute(f"PRAGMA {name}={value}")
         self.create_tables()
+        
+        # Freeze the column order and SQL text once per crawl. Only columns the
+        # live table actually has are written, so databases created by older
+        # versions keep working
+        live_columns = {
+            row[1]: row[4] for row in self.conn.execute("PRAGMA table_info(hardware_items)")
+        }
+        self.columns = tuple(c for c in HARDWARE_COLUMNS if c in live_columns)
+        missing = set(HARDWARE_COLUMNS) - set(live_columns)
+        if missing:
+            self.logger.warning(f"hardware_items lacks columns, not stored: {sorted(missing)}")
+        self.upsert_sql = _upsert_sql(self.columns)
+        # Every column is bound, so fields an item lacks get the schema
+        # DEFAULT (currency 'USD') here rather than NULL
+        self._defaults = tuple(
+            self.conn.execute(f"SELECT {live_columns[c]}").fetchone()[0]
+            if live_columns[c] is not None else None
+            for c in self.columns
+        )
+        # Which of those columns hold JSON text, resolved once rather than per value
+        self._json_columns = tuple(c in _JSON_FIELDS for c in self.columns)
+        
+        # Commits (and WAL checkpoints) block on fsync, so keep them off the
+        # reactor thread. A bounded queue pushes back if the disk falls behind
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._writer = threading.Thread(target=self._writer_loop, name='db-writer', daemon=True)
+        self._writer.start()
+        
         self.logger.info(f"Database connection opened: {self.database_url}")
     
     def close_spider(self, spider):
-        """Close database connection"""
+        """Flush pending items and close database connection"""
         if hasattr(self, 'conn'):
+            self._queue.put(_STOP)
+            self._writer.join()
             self.conn.close()
             self.logger.info("Database connection closed")
     
@@ -91,95 +227,138 @@ class DatabaseStoragePipeline:
         ''')
         
         # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON hardware_items(category)')
+        # (category, price) also serves plain category lookups, and turns the
+        # per-category price aggregates into an index-only scan
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_category_price ON hardware_items(category, price)')
+        # Older databases also have idx_category(category), which it makes redundant
+        cursor.execute('DROP INDEX IF EXISTS idx_category')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_brand ON hardware_items(brand)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON hardware_items(source_domain)')
+        # Covers the last-price lookup, so it never touches price_history rows
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ph_pid_ts ON price_history(product_id, timestamp DESC, price)')
+        # Backs the ON CONFLICT(source_url) upsert in flush()
+        try:
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_source_url ON hardware_items(source_url)')
+        except sqlite3.IntegrityError:
+            self.logger.error(
+                "hardware_items has duplicate source_url rows; remove them before "
+                "running this version of the pipeline"
+            )
+            raise
         
         self.conn.commit()
     
     def process_item(self, item, spider):
-        """Store item in database"""
+        """Queue item for the database writer thread"""
         adapter = ItemAdapter(item)
-        item_dict = dict(adapter)
-        
-        # Convert JSON fields
-        json_fields = ['specifications', 'key_features', 'image_urls', 'tags', 'validation_errors']
-        for field in json_fields:
-            if item_dict.get(field) is not None:
-                item_dict[field] = json.dumps(item_dict[field])
-        
-        # Insert or update item
-        product_id = self.insert_or_update_item(item_dict)
-        
-        # Store price history
-        if item_dict.get('price') is not None:
-            self.store_price_history(product_id, item_dict)
+        source_url = adapter.get('source_url')
+        
+        if not source_url:
+            self.logger.warning(f"Item without source_url not stored: {adapter.get('name')}")
+            return item
+        
+        # hardware_items.name is NOT NULL; one such row would fail its whole batch
+        if adapter.get('name') is None:
+            self.logger.warning(f"Item without name not stored: {source_url}")
+            return item
+        
+        # Build the upsert row straight from the item, JSON-encoding nested fields
+        row = tuple(
+            _dumps(value) if is_json and value is not None else value
+            for value, is_json in zip(
+                map(adapter.get, self.columns, self._defaults), self._json_columns
+            )
+        )
+        
+        price = adapter.get('price')
+        if price is not None:
+            price = (
+                price, adapter.get('currency', 'USD'),
+                adapter.get('scraped_timestamp', datetime.now().timestamp()),
+                source_url, adapter.get('availability_status')
+            )
         
+        self._queue.put((source_url, row, price))
         return item
     
-    def insert_or_update_item(self, item):
-        """Insert or update item in database"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            SELECT id FROM hardware_items
-            WHERE source_url = ?
-        ''', (item['source_url'],))
-        
-        existing = cursor.fetchone()
-        
-        if existing:
-            item_id = existing[0]
-            update_fields = [f"{k} = ?" for k in item.keys() if k != 'id']
-            update_values = [v for k, v in item.items() if k != 'id']
-            update_values.append(item_id)
+    def _writer_loop(self):
+        """Drain the queue in batches of up to batch_size items until stopped"""
+        stopping = False
+        while not stopping:
+            items = []
+            entry = self._queue.get()
+            # Items queued within a second of each other share a transaction
+            while entry is not _STOP:
+                items.append(entry)
+                if len(items) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get(timeout=1.0)
+                except queue.Empty:
+                    break
+            stopping = entry is _STOP
             
-            cursor.execute(f'''
-                UPDATE hardware_items 
-                SET {', '.join(update_fields)}
-                WHERE id = ?
-            ''', update_values)
-        else:
-            insert_fields = list(item.keys())
-            insert_values = list(item.values())
-            placeholders = ', '.join(['?' for _ in insert_fields])
-            
-            cursor.execute(f'''
-                INSERT INTO hardware_items ({', '.join(insert_fields)})
-                VALUES ({placeholders})
-            ''', insert_values)
-            
-            item_id = cursor.lastrowid
-        
-        self.conn.commit()
-        return item_id
+            if items:
+                self.flush_or_retry(items)
     
-    def store_price_history(self, product_id, item):
-        """Store price history"""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            SELECT price FROM price_history 
-            WHERE product_id = ? 
-            ORDER BY timestamp DESC 
-            LIMIT 1
-        ''', (product_id,))
-        
-        last_price = cursor.fetchone()
-        current_price = item.get('price')
+    def flush_or_retry(self, items):
+        """Flush a batch; if it fails, store its items one by one so only bad ones are lost"""
+        # Catch everything: a dead writer would block the crawl on a full queue
+        try:
+            self.flush(items)
+        except Exception:
+            # The rolled-back transaction may have advanced the price cache
+            self._last_price.clear()
+            if len(items) == 1:
+                self.logger.exception(f"Failed to store item {items[0][0]}")
+            else:
+                self.logger.warning(f"Failed to store a batch of {len(items)} items, "
+                                    f"retrying one by one", exc_info=True)
+                for entry in items:
+                    self.flush_or_retry([entry])
+    
+    def flush(self, items):
+        """Write queued (source_url, row, price) entries in one transaction"""
+        # Last occurrence of a URL wins, as it would with one write per item
+        latest = {source_url: row for source_url, row, _ in items}
         
-        if not last_price or last_price[0] != current_price:
-            cursor.execute('''
-                INSERT INTO price_history 
-                (product_id, price, currency, timestamp, source_url, availability_status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                product_id, current_price, item.get('currency', 'USD'),
-                item.get('scraped_timestamp', datetime.now().timestamp()),
-                item.get('source_url'), item.get('availability_status')
-            ))
+        cursor = self.conn.cursor()
+        with self.conn:
+            cursor.executemany(self.upsert_sql, latest.values())
+            existing = self.lookup_item_ids(cursor, latest)
             
-            self.conn.commit()
+            self.store_price_history(cursor, items, existing)
+        
+        self.logger.debug(f"Flushed {len(items)} items to {self.database_url}")
+    
+    def lookup_item_ids(self, cursor, urls):
+        """Map source URLs to hardware_items ids in a single query"""
+        # One bound JSON array instead of N placeholders keeps the SQL text
+        # constant, so sqlite3 reuses its cached prepared statement
+        cursor.execute(_LOOKUP_IDS_SQL, (json.dumps(list(urls)),))
+        return dict(cursor.fetchall())
+    
+    def store_price_history(self, cursor, items, item_ids):
+        """Store price history rows for items whose price changed"""
+        priced = [(item_ids[source_url], price) for source_url, _, price in items
+                  if price is not None]
+        last_price = self._last_price
+        
+        # Products seen for the first time this crawl: fetch their last price in one go
+        unknown = {product_id for product_id, _ in priced if product_id not in last_price}
+        if unknown:
+            cursor.execute(_LAST_PRICES_SQL, (json.dumps(list(unknown)),))
+            for product_id, price, _ in cursor.fetchall():
+                last_price[product_id] = price
+        
+        rows = []
+        for product_id, price in priced:
+            current_price = price[0]
+            if product_id not in last_price or last_price[product_id] != current_price:
+                last_price[product_id] = current_price
+                rows.append((product_id,) + price)
+        
+        cursor.executemany(_INSERT_PRICE_SQL, rows)
 
 
 class DataValidationPipeline:
@@ -190,24 +369,24 @@ class DataValidationPipeline:
     
     def process_item(self, item, spider):
         """Validate and clean item data"""
+        # Clean through the adapter so the fixes land on the item itself
         adapter = ItemAdapter(item)
-        item_dict = dict(adapter)
         
         # Basic validation
         errors = []
-        self.validate_required_fields(item_dict, errors)
+        self.validate_required_fields(adapter, errors)
         
         # Clean data
-        self.clean_price_data(item_dict)
-        self.normalize_text_fields(item_dict)
+        self.clean_price_data(adapter)
+        self.normalize_text_fields(adapter)
         
         # Calculate quality score
-        quality_score = self.calculate_quality_score(item_dict, errors)
+        quality_score = self.calculate_quality_score(adapter, errors)
         
         # Set validation metadata
-        item['validation_errors'] = errors
-        item['data_quality_score'] = quality_score
-        item['is_complete'] = len(errors) == 0
+        adapter['validation_errors'] = errors
+        adapter['data_quality_score'] = quality_score
+        adapter['is_complete'] = len(errors) == 0
         
         return item
     
@@ -230,8 +409,7 @@ class DataValidationPipeline:
         for field in price_fields:
             value = item.get(field)
             if value is not None and isinstance(value, str):
-                import re
-                price_match = re.search(r'[\d,]+\.?\d*', value.replace(',', ''))
+                price_match = _PRICE_RE.search(value.replace(',', ''))
                 if price_match:
                     try:
                         item[field] = float(price_match.group())
@@ -265,74 +443,80 @@ class ExportPipeline:
     
     def __init__(self, export_formats=None):
         self.export_formats = export_formats or ['json', 'csv']
-        self.exported_items = []
         self.logger = logging.getLogger(__name__)
+        # Opened on the first item so empty crawls leave no files behind
+        self._json_fp = None
+        self._csv_fp = None
+        self._csv_writer = None
+        self._csv_fields = ()
+        self._csv_json = ()
+        self._json_items = 0
     
     @classmethod
     def from_crawler(cls, crawler):
         return cls(crawler.settings.getlist('EXPORT_FORMATS', ['json', 'csv']))
     
     def process_item(self, item, spider):
-        """Collect items for export"""
-        self.exported_items.append(dict(item))
+        """Stream item to the export files"""
+        adapter = ItemAdapter(item)
+        if self._json_fp is None and self._csv_fp is None:
+            self.open_exports(spider, adapter)
+        
+        item_dict = adapter.asdict()
+        if self._json_fp is not None:
+            self.write_json(item_dict)
+        if self._csv_writer is not None:
+            self.write_csv(item_dict)
         return item
     
-    def close_spider(self, spider):
-        """Export all collected items"""
-        if not self.exported_items:
-            return
+    def open_exports(self, spider, adapter):
+        """Open one export file per configured format"""
+        os.makedirs("exports", exist_ok=True)
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        spider_name = spider.name
+        prefix = f"exports/{spider.name}_{timestamp}"
         
         for format_type in self.export_formats:
             try:
                 if format_type.lower() == 'json':
-                    self.export_json(spider_name, timestamp, self.exported_items)
+                    # Binary, so orjson's bytes are written without a decode
+                    self._json_fp = open(f"{prefix}.json", 'wb')
+                    self._json_fp.write(b'[')
                 elif format_type.lower() == 'csv':
-                    self.export_csv(spider_name, timestamp, self.exported_items)
+                    self._csv_fp = open(f"{prefix}.csv", 'w', newline='', encoding='utf-8')
+                    # Declared item fields give a stable header without seeing every item
+                    self._csv_fields = tuple(sorted(adapter.field_names()))
+                    self._csv_json = tuple(field in _JSON_FIELDS for field in self._csv_fields)
+                    self._csv_writer = csv.writer(self._csv_fp)
+                    self._csv_writer.writerow(self._csv_fields)
             except Exception as e:
                 self.logger.error(f"Failed to export {format_type}: {e}")
-        
-        self.exported_items = []
     
-    def export_json(self, spider_name, timestamp, items):
-        """Export to JSON"""
-        import os
-        os.makedirs("exports", exist_ok=True)
-        
-        filename = f"exports/{spider_name}_{timestamp}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(items, f, indent=2, ensure_ascii=False, default=str)
+    def write_json(self, item):
+        """Append one item to the JSON array"""
+        self._json_fp.write(b',\n' if self._json_items else b'\n')
+        self._json_fp.write(_dumps_export(item))
+        self._json_items += 1
     
-    def export_csv(self, spider_name, timestamp, items):
-        """Export to CSV"""
-        import os
-        os.makedirs("exports", exist_ok=True)
-        
-        filename = f"exports/{spider_name}_{timestamp}.csv"
-        
-        if not items:
-            return
-        
-        fieldnames = set()
-        for item in items:
-            fieldnames.update(item.keys())
-        fieldnames = sorted(list(fieldnames))
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for item in items:
-                row = {}
-                for key, value in item.items():
-                    if isinstance(value, (list, dict)):
-                        row[key] = json.dumps(value, default=str)
-                    else:
-                        row[key] = str(value) if value is not None else ''
-                writer.writerow(row)
+    def write_csv(self, item):
+        """Append one item as a CSV row"""
+        # Plain rows in header order skip DictWriter's per-row dict-to-list
+        # step; csv.writer str()s the remaining values itself
+        self._csv_writer.writerow([
+            '' if value is None else _dumps(value) if is_json else value
+            for value, is_json in zip(map(item.get, self._csv_fields), self._csv_json)
+        ])
+    
+    def close_spider(self, spider):
+        """Close the JSON array and the export files"""
+        if self._json_fp is not None:
+            self._json_fp.write(b'\n]\n')
+            self._json_fp.close()
+            self._json_fp = None
+        if self._csv_fp is not None:
+            self._csv_fp.close()
+            self._csv_fp = None
+            self._csv_writer = None
 
 
 class HardwareTrackerPipeline:
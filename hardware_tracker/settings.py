@@ -56,6 +56,18 @@ COOKIES_DEBUG = False
 # Disable Telnet Console for security
 TELNETCONSOLE_ENABLED = False
 
+# =============================================================================
+# DOWNLOAD HANDLERS
+# =============================================================================
+
+# Fetch HTTPS over HTTP/2 so concurrent requests to one host share a single
+# multiplexed TLS connection instead of paying a handshake per connection.
+# Requires Twisted[http2]. Note: Scrapy's HTTP/2 handler does not support
+# proxies - drop this override if you enable the proxy settings below.
+DOWNLOAD_HANDLERS = {
+    "https": "scrapy.core.downloader.handlers.http2.H2DownloadHandler",
+}
+
 # =============================================================================
 # REQUEST HEADERS
 # =============================================================================
@@ -87,9 +99,12 @@ SPIDER_MIDDLEWARES = {
 # DOWNLOADER MIDDLEWARES
 # =============================================================================
 
-# Enable our ethical downloader middleware
+# Enable our ethical downloader middleware. Responses pass through downloader
+# middlewares from the highest priority down, so it sits above RetryMiddleware
+# (550): a 429/503 backs the domain off before the retry is rescheduled, not
+# only once RETRY_TIMES is used up
 DOWNLOADER_MIDDLEWARES = {
-    "hardware_tracker.middlewares.EthicalDownloaderMiddleware": 100,
+    "hardware_tracker.middlewares.EthicalDownloaderMiddleware": 560,
     # Optional: Uncomment if you want strict robots.txt compliance
     # "hardware_tracker.middlewares.RobotsTxtMiddleware": 200,
     # Optional: Enable HTTP caching to reduce server load
@@ -104,7 +119,9 @@ DOWNLOADER_MIDDLEWARES = {
 ITEM_PIPELINES = {
     "hardware_tracker.pipelines.DataValidationPipeline": 100,   # Validate and clean data
     "hardware_tracker.pipelines.DatabaseStoragePipeline": 200,   # Store in SQLite database
-    "hardware_tracker.pipelines.ExportPipeline": 300,           # Export to JSON/CSV
+    # FEEDS below already writes JSON lines and CSV; enable this only for the
+    # per-spider exports/<spider>_<timestamp>.json/.csv files
+    # "hardware_tracker.pipelines.ExportPipeline": 300,         # Export to JSON/CSV
     "hardware_tracker.pipelines.HardwareTrackerPipeline": 400,   # Final processing
 }
 
@@ -112,13 +129,17 @@ ITEM_PIPELINES = {
 # FEEDS EXPORT SETTINGS
 # =============================================================================
 
+# Use the msgspec-backed JSON lines exporter (falls back to Scrapy's if missing)
+FEED_EXPORTERS = {
+    "jsonl": "hardware_tracker.exporters.FastJsonLinesItemExporter",
+}
+
 # Feed export settings for automated data output
 FEEDS = {
-    "exports/hardware_%(time)s.json": {
-        "format": "json",
+    "exports/hardware_%(time)s.jsonl": {
+        "format": "jsonl",
         "encoding": "utf8",
         "overwrite": False,
-        "indent": 2,
         "export_empty_fields": True,
     },
     "exports/hardware_%(time)s.csv": {
@@ -129,7 +150,7 @@ FEEDS = {
     }
 }
 
-# Export formats configuration
+# Export formats configuration (used by ExportPipeline when enabled)
 EXPORT_FORMATS = ["json", "csv"]
 
 # =============================================================================
@@ -139,6 +160,20 @@ EXPORT_FORMATS = ["json", "csv"]
 # SQLite database for storing scraped data
 DATABASE_URL = "hardware_data.db"
 
+# Items buffered per write transaction (flushed early when the spider closes)
+DB_BATCH_SIZE = 500
+
+# Items waiting for the database writer thread before process_item blocks
+DB_QUEUE_SIZE = 2000
+
+# SQLite PRAGMAs applied by DatabaseStoragePipeline.open_spider
+# Set DB_SYNCHRONOUS = "FULL" if a power loss must never drop the last commit
+DB_SYNCHRONOUS = "NORMAL"
+DB_TEMP_STORE = "MEMORY"
+DB_MMAP_SIZE = 268435456      # 256 MB memory-mapped I/O
+DB_CACHE_SIZE = -65536        # 64 MB page cache (negative = KiB)
+DB_WAL_AUTOCHECKPOINT = 1000  # Checkpoint the WAL every 1000 pages
+
 # =============================================================================
 # LOGGING SETTINGS
 # =============================================================================
@@ -196,6 +231,17 @@ CLOSESPIDER_ITEMCOUNT = 10000  # Close after scraping 10,000 items
 CLOSESPIDER_TIMEOUT = 3600     # Close after 1 hour
 CLOSESPIDER_ERRORCOUNT = 100   # Close after 100 errors
 
+# =============================================================================
+# REACTOR SETTINGS
+# =============================================================================
+
+# asyncio-based reactor, so asyncio libraries and async def callbacks can be awaited
+TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+
+# Threads for blocking work handed off by the reactor (DNS lookups mostly);
+# the database writer has its own thread, see DatabaseStoragePipeline
+REACTOR_THREADPOOL_MAXSIZE = 20
+
 # =============================================================================
 # DNS CACHE SETTINGS
 # =============================================================================
@@ -203,6 +249,7 @@ CLOSESPIDER_ERRORCOUNT = 100   # Close after 100 errors
 # Enable DNS caching to reduce DNS lookups
 DNSCACHE_ENABLED = True
 DNSCACHE_SIZE = 10000  # Cache up to 10,000 DNS entries
+DNS_TIMEOUT = 10  # Give up on a DNS lookup after 10 seconds (default 60)
 
 # =============================================================================
 # DEPTH CRAWLING SETTINGS
@@ -3,11 +3,15 @@ Amazon hardware spider using the base template.
 """
 
 import scrapy
-import time
 import re
 from urllib.parse import urljoin
 from hardware_tracker.spiders.base_spider import BaseHardwareSpider
-from hardware_tracker.items import HardwareTrackerItem
+
+
+# Compiled once instead of going through re's cache on every product page
+_PRICE_RE = re.compile(r'\d+(?:\.\d+)?')
+_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)\s*out of\s*5')
+_IMG_SIZE_RE = re.compile(r'\._[^.]+\.jpg')
 
 
 class AmazonHardwareSpider(BaseHardwareSpider):
@@ -36,15 +40,10 @@ class AmazonHardwareSpider(BaseHardwareSpider):
     }
     
     def parse_product(self, response):
-        item = HardwareTrackerItem()
+        item = self.build_item(response, source_domain='amazon.com')
         
         item['name'] = self.extract_text(response, self.selectors['title'])
         item['brand'] = self.extract_amazon_brand(response)
-        item['source_url'] = response.url
-        item['source_domain'] = 'amazon.com'
-        item['spider_name'] = self.name
-        item['crawl_id'] = self.crawl_id
-        item['scraped_timestamp'] = time.time()
         
         price_data = self.extract_amazon_price(response)
         item['price'] = price_data.get('price')
@@ -81,7 +80,7 @@ class AmazonHardwareSpider(BaseHardwareSpider):
         for selector in price_selectors:
             price_text = response.css(selector).get()
             if price_text:
-                price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
+                price_match = _PRICE_RE.search(price_text.replace(',', ''))
                 if price_match:
                     try:
                         price_data['price'] = float(price_match.group())
@@ -116,16 +115,21 @@ class AmazonHardwareSpider(BaseHardwareSpider):
     
     def extract_amazon_images(self, response):
         image_urls = []
+        seen = set()
         
         main_image = response.css('#main-image::attr(src)').get()
         if main_image:
             image_urls.append(main_image)
+            seen.add(main_image)
         
         thumb_images = response.css('#altImages img::attr(src)').getall()
         for img in thumb_images:
-            if img and img not in image_urls:
-                full_size_img = re.sub(r'\._[^.]+\.jpg', '._SL1500_.jpg', img)
-                image_urls.append(full_size_img)
+            if img and img not in seen:
+                full_size_img = _IMG_SIZE_RE.sub('._SL1500_.jpg', img)
+                seen.add(img)
+                if full_size_img not in seen:
+                    seen.add(full_size_img)
+                    image_urls.append(full_size_img)
         
         return image_urls
     
@@ -138,7 +142,7 @@ class AmazonHardwareSpider(BaseHardwareSpider):
         for selector in rating_selectors:
             rating_text = response.css(selector).get()
             if rating_text:
-                rating_match = re.search(r'(\d+\.?\d*)\s*out of\s*5', rating_text)
+                rating_match = _RATING_RE.search(rating_text)
                 if rating_match:
                     try:
                         return float(rating_match.group(1))
@@ -181,7 +185,7 @@ class AmazonHardwareSpider(BaseHardwareSpider):
     def extract_amazon_features(self, response):
         bullets = response.css('#feature-bullets ul li::text').getall()
         if bullets:
-            return [bullet.strip() for bullet in bullets if bullet.strip()]
+            return [bullet for bullet in map(str.strip, bullets) if bullet]
         return None
     
     def determine_amazon_stock_status(self, availability_text):
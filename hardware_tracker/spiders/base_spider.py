@@ -2,26 +2,79 @@
 Base spider template for hardware tracking with ethical scraping practices.
 """
 
+import re
 import scrapy
 import time
 import uuid
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
+from parsel.csstranslator import HTMLTranslator
 from hardware_tracker.items import HardwareTrackerItem
 
 
+# Compiled once at import instead of per product page
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+_RATING_RE = re.compile(r'(\d+\.?\d*)\s*out of\s*5', re.IGNORECASE)
+
+# Stock phrases, checked with plain substring tests
+_IN_STOCK_WORDS = ('in stock', 'available', 'buy')
+_OUT_OF_STOCK_WORDS = ('out of stock', 'sold out', 'unavailable')
+
+# Same CSS-to-XPath translation parsel applies to HTML responses
+_css_to_xpath = HTMLTranslator().css_to_xpath
+
+
+def url_netloc(url):
+    """Host part of an absolute URL, without building a urlparse() ParseResult"""
+    return url.split('/', 3)[2]
+
+
+def _text_xpath(xpath):
+    """Whitespace-normalized string value of the first node matched by xpath"""
+    return f'normalize-space(({xpath})[1])'
+
+
+# 'table tr, .spec-row' as a single XPath union, walked once per page
+_SPEC_ROWS_XPATH = _css_to_xpath('table tr, .spec-row')
+
+# First non-blank text anywhere in a cell, so <th><strong>Chipset</strong></th> counts
+_CELL_TEXT_XPATH = 'descendant::text()[normalize-space()][1]'
+
+
 class BaseHardwareSpider(scrapy.Spider):
     """Base spider for hardware tracking"""
     
     name = "base_hardware"
     custom_settings = {
         'ROBOTSTXT_OBEY': True,
-        'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
-        'DOWNLOAD_DELAY': 2,
+        # Per-domain pacing is done by EthicalDownloaderMiddleware (2-3s between
+        # request starts per retailer), so a fixed slot delay on top of it only
+        # stacks up idle time; extra concurrency just overlaps slow responses
+        'CONCURRENT_REQUESTS': 64,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+        'DOWNLOAD_DELAY': 0,
+        'DOWNLOAD_TIMEOUT': 60,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        'AUTOTHROTTLE_START_DELAY': 1,
+        'AUTOTHROTTLE_MAX_DELAY': 15,
         'RETRY_TIMES': 3,
         'RETRY_HTTP_CODES': [429, 500, 502, 503, 504],
         'COOKIES_ENABLED': True,
     }
     
+    # Class-level so retailer spiders can override them
+    selectors = {
+        'product_links': 'a[href*="/product"]',
+        'next_page': '.pagination .next',
+        'price': '.price, .product-price',
+        'title': 'h1, .product-title',
+        'brand': '.brand, [class*="brand"]',
+        'description': '.description',
+        'availability': '.availability',
+        'rating': '.rating',
+        'image': '.product-image img',
+    }
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.crawl_id = str(uuid.uuid4())
@@ -35,65 +88,54 @@ class BaseHardwareSpider(scrapy.Spider):
             'motherboard': ['Motherboard', 'MB'],
             'psu': ['PSU', 'Power Supply'],
         }
+        # Lowercased once here rather than on every determine_category() call
+        self._category_keywords = tuple(
+            (category.upper(), tuple(keyword.lower() for keyword in keywords))
+            for category, keywords in self.categories.items()
+        )
         
-        self.selectors = {
-            'product_links': 'a[href*="/product"]',
-            'next_page': '.pagination .next',
-            'price': '.price, .product-price',
-            'title': 'h1, .product-title',
-            'brand': '.brand, [class*="brand"]',
-            'description': '.description',
-            'availability': '.availability',
-            'rating': '.rating',
-            'image': '.product-image img',
-        }
+        # Translate the spider's CSS selectors once; select() then goes straight
+        # to response.xpath() on every page
+        self._xpaths = {css: _css_to_xpath(css) for css in self.selectors.values()}
+        self._text_xpaths = {css: _text_xpath(xpath) for css, xpath in self._xpaths.items()}
     
     def start_requests(self):
+        # crawl_id is not copied into every request's meta: it lives on the
+        # spider, and EthicalSpiderMiddleware stamps it on each response
         for url in self.start_urls:
             yield scrapy.Request(
                 url,
                 callback=self.parse,
-                meta={
-                    'start_time': time.time(),
-                    'crawl_id': self.crawl_id,
-                    'depth': 0
-                }
+                meta={'depth': 0}
             )
     
+    def select(self, response, selector):
+        """Run a CSS selector, using its precompiled XPath when it has one"""
+        xpath = self._xpaths.get(selector)
+        return response.xpath(xpath) if xpath is not None else response.css(selector)
+    
     def parse(self, response):
-        product_links = response.css(self.selectors['product_links']).xpath('@href').getall()
+        product_links = self.select(response, self.selectors['product_links']).xpath('@href').getall()
         
         for link in product_links:
             full_url = urljoin(response.url, link)
-            yield scrapy.Request(
-                full_url,
-                callback=self.parse_product,
-                meta={'crawl_id': self.crawl_id}
-            )
+            yield scrapy.Request(full_url, callback=self.parse_product)
         
         # Handle pagination
-        next_page = response.css(self.selectors['next_page']).xpath('@href').get()
+        next_page = self.select(response, self.selectors['next_page']).xpath('@href').get()
         if next_page:
             next_url = urljoin(response.url, next_page)
             yield scrapy.Request(
                 next_url,
                 callback=self.parse,
-                meta={
-                    'crawl_id': self.crawl_id,
-                    'depth': response.meta.get('depth', 0) + 1
-                }
+                meta={'depth': response.meta.get('depth', 0) + 1}
             )
     
     def parse_product(self, response):
-        item = HardwareTrackerItem()
+        item = self.build_item(response, source_domain=url_netloc(response.url))
         
         item['name'] = self.extract_text(response, self.selectors['title'])
         item['brand'] = self.extract_text(response, self.selectors['brand'])
-        item['source_url'] = response.url
-        item['source_domain'] = urlparse(response.url).netloc
-        item['spider_name'] = self.name
-        item['crawl_id'] = self.crawl_id
-        item['scraped_timestamp'] = time.time()
         
         item['price'] = self.extract_price(response, self.selectors['price'])
         item['currency'] = self.detect_currency(response, self.selectors['price'])
@@ -115,22 +157,32 @@ class BaseHardwareSpider(scrapy.Spider):
         if self.is_valid_item(item):
             yield item
     
+    def build_item(self, response, **fields):
+        """Create an item with the crawl metadata every spider records, in one go"""
+        return HardwareTrackerItem(
+            source_url=response.url,
+            spider_name=self.name,
+            crawl_id=self.crawl_id,
+            scraped_timestamp=time.time(),
+            **fields,
+        )
+    
     def extract_text(self, response, selector):
         try:
-            text = response.css(selector).get()
+            # libxml2 collapses the whitespace, no Python split/join needed
+            xpath = self._text_xpaths.get(selector) or _text_xpath(_css_to_xpath(selector))
+            text = response.xpath(xpath).get()
             if text:
-                return ' '.join(text.split())
+                return text
         except Exception:
             pass
         return None
     
     def extract_price(self, response, selector):
         try:
-            price_text = response.css(selector).get()
+            price_text = self.select(response, selector).get()
             if price_text:
-                import re
-                price_pattern = r'[\d,]+\.?\d*'
-                match = re.search(price_pattern, price_text.replace(',', ''))
+                match = _PRICE_RE.search(price_text.replace(',', ''))
                 if match:
                     return float(match.group())
         except Exception:
@@ -139,7 +191,7 @@ class BaseHardwareSpider(scrapy.Spider):
     
     def detect_currency(self, response, selector):
         try:
-            price_text = response.css(selector).get() or ''
+            price_text = self.select(response, selector).get() or ''
             if '$' in price_text:
                 return 'USD'
             elif '€' in price_text:
@@ -157,17 +209,17 @@ class BaseHardwareSpider(scrapy.Spider):
         
         availability_lower = availability_text.lower()
         
-        if any(word in availability_lower for word in ['in stock', 'available', 'buy']):
+        if any(word in availability_lower for word in _IN_STOCK_WORDS):
             return True
         
-        if any(word in availability_lower for word in ['out of stock', 'sold out', 'unavailable']):
+        if any(word in availability_lower for word in _OUT_OF_STOCK_WORDS):
             return False
         
         return None
     
     def extract_image_urls(self, response, selector):
         try:
-            img_elements = response.css(selector)
+            img_elements = self.select(response, selector)
             image_urls = []
             
             for img in img_elements:
@@ -182,11 +234,9 @@ class BaseHardwareSpider(scrapy.Spider):
     
     def extract_rating(self, response, selector):
         try:
-            rating_text = response.css(selector).get()
+            rating_text = self.select(response, selector).get()
             if rating_text:
-                import re
-                rating_pattern = r'(\d+\.?\d*)\s*out of\s*5'
-                match = re.search(rating_pattern, rating_text, re.IGNORECASE)
+                match = _RATING_RE.search(rating_text)
                 if match:
                     rating_value = float(match.group(1))
                     if 0 <= rating_value <= 5:
@@ -201,22 +251,22 @@ class BaseHardwareSpider(scrapy.Spider):
         
         text = f"{name or ''} {description or ''}".lower()
         
-        for category, keywords in self.categories.items():
+        for category, keywords in self._category_keywords:
             for keyword in keywords:
-                if keyword.lower() in text:
-                    return category.upper()
+                if keyword in text:
+                    return category
         
         return 'Other'
     
     def extract_specifications(self, response):
         specs = {}
-        spec_rows = response.css('table tr, .spec-row')
+        spec_rows = response.xpath(_SPEC_ROWS_XPATH)
         
         for row in spec_rows:
-            cells = row.css('td, th')
+            cells = row.xpath('.//td|.//th')
             if len(cells) >= 2:
-                key = cells[0].css('::text').get()
-                value = cells[1].css('::text').get()
+                key = cells[0].xpath(_CELL_TEXT_XPATH).get()
+                value = cells[1].xpath(_CELL_TEXT_XPATH).get()
                 if key and value:
                     specs[key.strip()] = value.strip()
         
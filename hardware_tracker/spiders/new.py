@@ -6,8 +6,55 @@ Demonstrates how to adapt the base spider for different retailer structures.
 import scrapy
 import re
 from urllib.parse import urljoin
-from hardware_tracker.spiders.base_spider import BaseHardwareSpider
-from hardware_tracker.items import HardwareTrackerItem
+from hardware_tracker.spiders.base_spider import BaseHardwareSpider, url_netloc
+
+
+# Compiled once at import instead of per product page
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+_RATING_RE = re.compile(r'(\d+\.?\d*)\s*stars?.*?out of 5', re.IGNORECASE)
+_COUNT_RE = re.compile(r'(\d+)')
+_PAREN_COUNT_RE = re.compile(r'\((\d+)\)')
+_REVIEW_COUNT_RE = re.compile(r'(\d+)\s*(?:reviews?|ratings?)', re.IGNORECASE)
+_META_SPEC_RE = re.compile(r'([^,]+):\s*([^,]+)')
+_SKU_RES = (
+    re.compile(r'/Product/([^?]+)'),
+    re.compile(r'\?Item=(\d+[^&]*)'),
+)
+_PART_NUMBER_RE = re.compile(r'[A-Z0-9\-]{4,}')
+_SLUG_NON = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+_WARRANTY_RE = re.compile(r'warranty[^.]{0,40}?\d+\s*year', re.IGNORECASE)
+
+# Newegg stock phrases, checked with plain substring tests
+_IN_STOCK_PHRASES = ('in stock', 'available', 'in stock now', 'ready to ship')
+_OUT_OF_STOCK_PHRASES = ('out of stock', 'discontinued', 'no longer available')
+_UNKNOWN_STOCK_PHRASES = ('backorder', 'pre-order', 'coming soon')
+
+# '.product-specs tr, .specs-table tr' and, per row, the first non-blank text
+# anywhere in its first two cells (so <strong>/<a> wrapped text counts); a row
+# whose key or value cell is empty yields < 2 nodes
+_SPEC_ROWS_XPATH = (
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' product-specs ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' specs-table ')]//tr"
+)
+_SPEC_CELLS_XPATH = (
+    '(td|th)[1]/descendant::text()[normalize-space()][1]'
+    ' | (td|th)[2]/descendant::text()[normalize-space()][1]'
+)
+
+# Value cell of the spec rows whose key cell mentions the model number or MPN
+# (the cell itself, so its string value includes text inside <a>/<span>)
+_PART_NUMBER_CELLS_XPATH = (
+    _SPEC_ROWS_XPATH
+    + "[*[self::td or self::th][1][contains(translate(., 'MODELPN', 'modelpn'), 'model')"
+    " or contains(translate(., 'MODELPN', 'modelpn'), 'mpn')]]"
+    "/*[self::td or self::th][2]"
+)
+
+# Warranty terms live in the spec table or the bullet list, not the whole page
+_WARRANTY_TEXT_XPATH = (
+    '//*[contains(@class, "product-specs") or contains(@class, "product-bullets")]//text()'
+)
 
 
 class NeweggHardwareSpider(BaseHardwareSpider):
@@ -41,16 +88,11 @@ class NeweggHardwareSpider(BaseHardwareSpider):
     
     def parse_product(self, response):
         """Enhanced product parsing for Newegg structure"""
-        item = HardwareTrackerItem()
+        item = self.build_item(response, source_domain='newegg.com')
         
         # Extract Newegg-specific information
         item['name'] = self.extract_text(response, self.selectors['title'])
         item['brand'] = self.extract_newegg_brand(response)
-        item['source_url'] = response.url
-        item['source_domain'] = 'newegg.com'
-        item['spider_name'] = self.name
-        item['crawl_id'] = self.crawl_id
-        item['scraped_timestamp'] = time.time()
         
         # Newegg-specific price extraction
         price_data = self.extract_newegg_price(response)
@@ -110,7 +152,7 @@ class NeweggHardwareSpider(BaseHardwareSpider):
             price_text = response.css(selector).get()
             if price_text:
                 # Clean price text and extract number
-                price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
+                price_match = _PRICE_RE.search(price_text.replace(',', ''))
                 if price_match:
                     try:
                         price_data['price'] = float(price_match.group())
@@ -121,7 +163,7 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         # Check for original/discount price
         was_price = response.css('.price-was::text').get()
         if was_price and price_data['price']:
-            was_match = re.search(r'[\d,]+\.?\d*', was_price.replace(',', ''))
+            was_match = _PRICE_RE.search(was_price.replace(',', ''))
             if was_match:
                 try:
                     original_price = float(was_match.group())
@@ -156,19 +198,24 @@ class NeweggHardwareSpider(BaseHardwareSpider):
     def extract_newegg_images(self, response):
         """Extract product images from Newegg"""
         image_urls = []
+        seen = set()  # O(1) duplicate checks, image_urls keeps the page order
         
         # Main product image
         main_image = response.css('.product-image img::attr(src)').get()
         if main_image:
             image_urls.append(main_image)
+            seen.add(main_image)
         
         # Thumbnail images
         thumb_images = response.css('.product-photos img::attr(src)').getall()
         for img in thumb_images:
-            if img and img not in image_urls:
+            if img and img not in seen:
                 # Convert thumbnail to full size (Newegg specific)
                 full_size_img = img.replace('_128', '_500') if '_128' in img else img
-                image_urls.append(full_size_img)
+                seen.add(img)
+                if full_size_img not in seen:
+                    seen.add(full_size_img)
+                    image_urls.append(full_size_img)
         
         return image_urls
     
@@ -176,43 +223,55 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         """Extract rating and review count from Newegg"""
         rating_data = {'rating': None, 'count': None}
         
-        # Extract rating from alt text or title attribute
+        # Extract rating from alt text or title attribute; the same string
+        # often carries the review count too ("4.5 out of 5 eggs, 1,234 reviews")
         rating_selectors = [
             '.rating::attr(title)',
             '.item-rating::attr(title)',
             '.rating::text'
         ]
         
+        # Reused by the review count fallback below instead of querying again
+        fetched = {}
+        
         for selector in rating_selectors:
-            rating_text = response.css(selector).get()
-            if rating_text:
-                # Look for "X stars" or "X.X stars out of 5 stars"
-                rating_match = re.search(r'(\d+\.?\d*)\s*stars?.*?out of 5', rating_text, re.IGNORECASE)
+            rating_text = fetched[selector] = response.css(selector).get()
+            if not rating_text:
+                continue
+            
+            # Look for "X stars" or "X.X stars out of 5 stars"
+            if rating_data['rating'] is None:
+                rating_match = _RATING_RE.search(rating_text)
                 if rating_match:
-                    try:
-                        rating_data['rating'] = float(rating_match.group(1))
-                        break
-                    except ValueError:
-                        continue
-        
-        # Extract review count
+                    rating_data['rating'] = float(rating_match.group(1))
+            
+            # Look for "N reviews" next to the rating
+            if rating_data['count'] is None:
+                count_match = _REVIEW_COUNT_RE.search(rating_text.replace(',', ''))
+                if count_match:
+                    rating_data['count'] = int(count_match.group(1))
+            
+            if rating_data['rating'] is not None and rating_data['count'] is not None:
+                return rating_data
+        
+        # Fall back to a parenthesized count in the rating text, e.g. "(1,234)",
+        # or the first number in the dedicated review count elements. The
+        # rating text may also hold the stars ("4 out of 5 eggs"), so a bare
+        # number there is not taken as the count
         review_selectors = [
-            '.rating::text',
-            '.review-count::text',
-            '.total-reviews::text'
+            ('.rating::text', _PAREN_COUNT_RE),
+            ('.review-count::text', _COUNT_RE),
+            ('.total-reviews::text', _COUNT_RE)
         ]
         
-        for selector in review_selectors:
-            count_text = response.css(selector).get()
+        for selector, count_re in review_selectors:
+            count_text = fetched[selector] if selector in fetched else response.css(selector).get()
             if count_text:
                 # Look for number of reviews
-                count_match = re.search(r'(\d+)', count_text.replace(',', ''))
+                count_match = count_re.search(count_text.replace(',', ''))
                 if count_match:
-                    try:
-                        rating_data['count'] = int(count_match.group(1))
-                        break
-                    except ValueError:
-                        continue
+                    rating_data['count'] = int(count_match.group(1))
+                    break
         
         return rating_data
     
@@ -227,11 +286,10 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         ]
         
         for selector in description_selectors:
-            description = response.css(selector).get()
-            if description:
-                description = ' '.join(description.split())
-                if len(description) > 50:
-                    return description
+            # extract_text already collapses whitespace in XPath
+            description = self.extract_text(response, selector)
+            if description and len(description) > 50:
+                return description
         
         return None
     
@@ -251,21 +309,18 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         specs = {}
         
         # Product specifications table
-        spec_rows = response.css('.product-specs tr, .specs-table tr')
-        
-        for row in spec_rows:
-            cells = row.css('td, th')
-            if len(cells) >= 2:
-                key = cells[0].css('::text').get()
-                value = cells[1].css('::text').get()
-                if key and value:
-                    specs[key.strip()] = value.strip()
+        # One XPath per row instead of a cell query plus two text queries
+        for row in response.xpath(_SPEC_ROWS_XPATH):
+            cells = row.xpath(_SPEC_CELLS_XPATH).getall()
+            if len(cells) == 2:
+                key, value = cells
+                specs[key.strip()] = value.strip()
         
         # Extract from meta description
         meta_desc = response.css('meta[name="description"]::attr(content)').get()
         if meta_desc:
             # Look for spec patterns in meta description
-            spec_matches = re.findall(r'([^,]+):\s*([^,]+)', meta_desc)
+            spec_matches = _META_SPEC_RE.findall(meta_desc)
             for key, value in spec_matches:
                 if len(key) < 50 and len(value) < 100:
                     specs[key.strip()] = value.strip()
@@ -276,19 +331,14 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         """Extract key features from Newegg bullet points"""
         bullets = response.css('.product-bullets li::text').getall()
         if bullets:
-            return [bullet.strip() for bullet in bullets if bullet.strip()]
+            return [bullet for bullet in map(str.strip, bullets) if bullet]
         return None
     
     def extract_newegg_sku(self, response):
         """Extract product SKU"""
         # Newegg SKU patterns
-        sku_patterns = [
-            r'/Product/([^?]+)',
-            r'\?Item=(\d+[^&]*)'
-        ]
-        
-        for pattern in sku_patterns:
-            match = re.search(pattern, response.url)
+        for pattern in _SKU_RES:
+            match = pattern.search(response.url)
             if match:
                 return match.group(1)
         
@@ -301,29 +351,21 @@ class NeweggHardwareSpider(BaseHardwareSpider):
     
     def extract_newegg_part_number(self, response):
         """Extract part number"""
-        # Look in specifications or model number fields
-        part_selectors = [
-            '.product-specs td::text',
-            '.specs-table td::text'
-        ]
-        
-        for selector in part_selectors:
-            texts = response.css(selector).getall()
-            for text in texts:
-                if 'model' in text.lower() or 'mpn' in text.lower():
-                    # Extract alphanumeric code
-                    part_match = re.search(r'[A-Z0-9\-]+', text)
-                    if part_match and len(part_match.group()) > 3:
-                        return part_match.group()
+        # Only the model / MPN rows come back from lxml, not every spec cell
+        for cell in response.xpath(_PART_NUMBER_CELLS_XPATH):
+            text = cell.xpath('normalize-space()').get()
+            # Extract alphanumeric code
+            part_match = _PART_NUMBER_RE.search(text)
+            if part_match:
+                return part_match.group()
         
         return None
     
     def extract_newegg_warranty(self, response):
         """Extract warranty information"""
-        warranty_text = response.css('*::text').re(r'warranty.*?\d+.*?year', re.IGNORECASE)
-        if warranty_text:
-            return warranty_text[0] if warranty_text else None
-        return None
+        text = ' '.join(response.xpath(_WARRANTY_TEXT_XPATH).getall())
+        match = _WARRANTY_RE.search(text)
+        return match.group(0) if match else None
     
     def determine_newegg_stock_status(self, availability_text):
         """Determine stock status for Newegg"""
@@ -333,19 +375,13 @@ class NeweggHardwareSpider(BaseHardwareSpider):
         text_lower = availability_text.lower()
         
         # Newegg-specific stock indicators
-        if any(phrase in text_lower for phrase in [
-            'in stock', 'available', 'in stock now', 'ready to ship'
-        ]):
+        if any(phrase in text_lower for phrase in _IN_STOCK_PHRASES):
             return True
         
-        if any(phrase in text_lower for phrase in [
-            'out of stock', 'discontinued', 'no longer available'
-        ]):
+        if any(phrase in text_lower for phrase in _OUT_OF_STOCK_PHRASES):
             return False
         
-        if any(phrase in text_lower for phrase in [
-            'backorder', 'pre-order', 'coming soon'
-        ]):
+        if any(phrase in text_lower for phrase in _UNKNOWN_STOCK_PHRASES):
             return None  # Unknown status
         
         return None
@@ -383,18 +419,28 @@ class NeweggHardwareSpider(BaseHardwareSpider):
     
     def generate_newegg_slug(self, name):
         """Generate URL slug for Newegg product"""
-        import re
-        slug = re.sub(r'[^\w\s-]', '', name.lower())
-        slug = re.sub(r'[-\s]+', '-', slug)
+        slug = _SLUG_NON.sub('', name.lower())
+        slug = _SLUG_DASH.sub('-', slug)
         return slug[:50] if slug else None
 
 
-class NeweggBestBuySpider(BaseHardwareSpider):
+class NeweggBestBuySpider(NeweggHardwareSpider):
     """Example spider showing how to create a hybrid scraper for multiple similar sites"""
     
     name = "newegg_bestbuy_hardware"
     allowed_domains = ["newegg.com", "bestbuy.com"]
     
+    # Breadth-first (FIFO) scheduling interleaves the two retailers instead of
+    # draining one domain's LIFO stack while the other sits idle
+    custom_settings = {
+        **BaseHardwareSpider.custom_settings,
+        'SCHEDULER_DISK_QUEUE': 'scrapy.squeues.PickleFifoDiskQueue',
+        'SCHEDULER_MEMORY_QUEUE': 'scrapy.squeues.FifoMemoryQueue',
+        'DEPTH_PRIORITY': 1,
+        'CONCURRENT_REQUESTS': 32,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+    }
+    
     start_urls = [
         # Newegg URLs
         "https://www.newegg.com/p/pl?d=graphics+cards",
@@ -404,7 +450,7 @@ class NeweggBestBuySpider(BaseHardwareSpider):
     
     def parse(self, response):
         """Parse based on domain to use appropriate logic"""
-        domain = urlparse(response.url).netloc
+        domain = url_netloc(response.url)
         
         if 'newegg.com' in domain:
             # Use Newegg logic
@@ -423,11 +469,8 @@ class NeweggBestBuySpider(BaseHardwareSpider):
         for product in products:
             product_url = product.css('a.item-title::attr(href)').get()
             if product_url:
-                yield response.follow(
-                    product_url, 
-                    callback=self.parse_newegg_product,
-                    meta={'crawl_id': self.crawl_id}
-                )
+                # Inherited NeweggHardwareSpider.parse_product handles Newegg pages
+                yield response.follow(product_url, callback=self.parse_product)
     
     def parse_bestbuy_listing(self, response):
         """Parse Best Buy listing page"""
@@ -436,24 +479,11 @@ class NeweggBestBuySpider(BaseHardwareSpider):
         for product in products:
             product_url = product.css('a::attr(href)').get()
             if product_url:
-                yield response.follow(
-                    product_url,
-                    callback=self.parse_bestbuy_product, 
-                    meta={'crawl_id': self.crawl_id}
-                )
-    
-    def parse_newegg_product(self, response):
-        """Parse individual Newegg product"""
-        # Use Newegg spider logic
-        yield from NeweggHardwareSpider().parse_product(response)
+                yield response.follow(product_url, callback=self.parse_bestbuy_product)
     
     def parse_bestbuy_product(self, response):
         """Parse individual Best Buy product"""
         # Basic parsing for Best Buy (would need full implementation)
-        item = HardwareTrackerItem()
+        item = self.build_item(response, source_domain='bestbuy.com')
         item['name'] = response.css('h1::text').get()
-        item['source_url'] = response.url
-        item['source_domain'] = 'bestbuy.com'
-        item['spider_name'] = self.name
-        item['crawl_id'] = self.crawl_id
         yield item
\ No newline at end of file
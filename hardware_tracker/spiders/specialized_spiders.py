@@ -3,10 +3,64 @@ Specialized spiders for different hardware categories.
 """
 
 import scrapy
+from urllib.parse import urljoin
 from hardware_tracker.spiders.base_spider import BaseHardwareSpider
 from hardware_tracker.items import HardwareTrackerItem
 
 
+# Standard spec field -> keywords its source key may contain, per category
+_GPU_FIELDS = (
+    ('gpu chipset', ('gpu', 'chipset', 'graphics processor')),
+    ('memory', ('vram', 'memory', 'video memory')),
+    ('core clock', ('core clock', 'base clock', 'gpu clock')),
+    ('boost clock', ('boost clock', 'max clock')),
+    ('power consumption', ('power', 'tdp', 'wattage')),
+)
+
+_CPU_FIELDS = (
+    ('socket', ('socket', 'cpu socket')),
+    ('cores', ('cores', 'cpu cores')),
+    ('threads', ('threads', 'logical processors')),
+    ('base clock', ('base clock', 'base frequency')),
+    ('boost clock', ('boost clock', 'max turbo')),
+    ('cache', ('cache', 'l3 cache', 'l2 cache')),
+    ('tdp', ('tdp', 'power consumption')),
+)
+
+_RAM_FIELDS = (
+    ('capacity', ('capacity', 'size', 'total capacity')),
+    ('modules', ('modules', 'kit', 'sticks')),
+    ('type', ('type', 'ddr', 'memory type')),
+    ('speed', ('speed', 'frequency', 'mhz', 'data rate')),
+    ('timing', ('timing', 'cas', 'latency')),
+)
+
+# Tags every item of a category gets
+_GPU_TAGS = ('gpu', 'graphics_card', 'graphics')
+_CPU_TAGS = ('cpu', 'processor', 'central_processor')
+_RAM_TAGS = ('ram', 'memory', 'ddr')
+
+
+def _standardize_specs(specs, fields):
+    """Map raw spec keys onto standard fields; each field takes the first matching key"""
+    enhanced_specs = {}
+    # One pass over the specs, lowercasing each key once
+    for key, value in specs.items():
+        key_lower = key.lower()
+        for standard_field, keywords in fields:
+            if standard_field in enhanced_specs:
+                continue
+            # Plain loop rather than any(<generator>): no generator frame per field
+            for keyword in keywords:
+                if keyword in key_lower:
+                    enhanced_specs[standard_field] = value
+                    break
+        # Every field is filled, the remaining keys cannot change anything
+        if len(enhanced_specs) == len(fields):
+            break
+    return enhanced_specs
+
+
 class GPUHardwareSpider(BaseHardwareSpider):
     """Specialized spider for Graphics Cards (GPUs)"""
     
@@ -21,38 +75,22 @@ class GPUHardwareSpider(BaseHardwareSpider):
         """GPU-specific item customization"""
         gpu_specs = item.get('specifications', {}) or {}
         
-        gpu_fields = {
-            'gpu chipset': ['gpu', 'chipset', 'graphics processor'],
-            'memory': ['vram', 'memory', 'video memory'],
-            'core clock': ['core clock', 'base clock', 'gpu clock'],
-            'boost clock': ['boost clock', 'max clock'],
-            'power consumption': ['power', 'tdp', 'wattage'],
-        }
-        
-        enhanced_specs = {}
-        for standard_field, keywords in gpu_fields.items():
-            for key, value in gpu_specs.items():
-                key_lower = key.lower()
-                if any(keyword in key_lower for keyword in keywords):
-                    enhanced_specs[standard_field] = value
-                    break
+        enhanced_specs = _standardize_specs(gpu_specs, _GPU_FIELDS)
         
         item['specifications'] = enhanced_specs if enhanced_specs else gpu_specs
         item['category'] = 'GPU'
         item['hardware_type'] = 'graphics_card'
         
-        # Add GPU-specific tags
-        tags = item.get('tags', []) or []
-        tags.extend(['gpu', 'graphics_card', 'graphics'])
-        
+        # Add GPU-specific tags (dict.fromkeys drops repeats, keeping order)
+        vendor_tags = ()
         if item.get('brand'):
             brand_lower = item['brand'].lower()
             if 'nvidia' in brand_lower:
-                tags.append('nvidia')
+                vendor_tags = ('nvidia',)
             elif 'amd' in brand_lower or 'radeon' in brand_lower:
-                tags.append('amd')
+                vendor_tags = ('amd',)
         
-        item['tags'] = tags
+        item['tags'] = list(dict.fromkeys((*(item.get('tags') or ()), *_GPU_TAGS, *vendor_tags)))
 
 
 class CPUHardwareSpider(BaseHardwareSpider):
@@ -69,40 +107,22 @@ class CPUHardwareSpider(BaseHardwareSpider):
         """CPU-specific item customization"""
         cpu_specs = item.get('specifications', {}) or {}
         
-        cpu_fields = {
-            'socket': ['socket', 'cpu socket'],
-            'cores': ['cores', 'cpu cores'],
-            'threads': ['threads', 'logical processors'],
-            'base clock': ['base clock', 'base frequency'],
-            'boost clock': ['boost clock', 'max turbo'],
-            'cache': ['cache', 'l3 cache', 'l2 cache'],
-            'tdp': ['tdp', 'power consumption'],
-        }
-        
-        enhanced_specs = {}
-        for standard_field, keywords in cpu_fields.items():
-            for key, value in cpu_specs.items():
-                key_lower = key.lower()
-                if any(keyword in key_lower for keyword in keywords):
-                    enhanced_specs[standard_field] = value
-                    break
+        enhanced_specs = _standardize_specs(cpu_specs, _CPU_FIELDS)
         
         item['specifications'] = enhanced_specs if enhanced_specs else cpu_specs
         item['category'] = 'CPU'
         item['hardware_type'] = 'processor'
         
         # Add CPU-specific tags
-        tags = item.get('tags', []) or []
-        tags.extend(['cpu', 'processor', 'central_processor'])
-        
+        intel_tags = amd_tags = ()
         if item.get('name'):
             name_lower = item['name'].lower()
             if 'core' in name_lower:
-                tags.append('intel')
+                intel_tags = ('intel',)
             if 'ryzen' in name_lower or 'athlon' in name_lower:
-                tags.append('amd')
+                amd_tags = ('amd',)
         
-        item['tags'] = tags
+        item['tags'] = list(dict.fromkeys((*(item.get('tags') or ()), *_CPU_TAGS, *intel_tags, *amd_tags)))
 
 
 class RAMHardwareSpider(BaseHardwareSpider):
@@ -119,40 +139,24 @@ class RAMHardwareSpider(BaseHardwareSpider):
         """RAM-specific item customization"""
         ram_specs = item.get('specifications', {}) or {}
         
-        ram_fields = {
-            'capacity': ['capacity', 'size', 'total capacity'],
-            'modules': ['modules', 'kit', 'sticks'],
-            'type': ['type', 'ddr', 'memory type'],
-            'speed': ['speed', 'frequency', 'mhz', 'data rate'],
-            'timing': ['timing', 'cas', 'latency'],
-        }
-        
-        enhanced_specs = {}
-        for standard_field, keywords in ram_fields.items():
-            for key, value in ram_specs.items():
-                key_lower = key.lower()
-                if any(keyword in key_lower for keyword in keywords):
-                    enhanced_specs[standard_field] = value
-                    break
+        enhanced_specs = _standardize_specs(ram_specs, _RAM_FIELDS)
         
         item['specifications'] = enhanced_specs if enhanced_specs else ram_specs
         item['category'] = 'RAM'
         item['hardware_type'] = 'memory'
         
         # Add RAM-specific tags
-        tags = item.get('tags', []) or []
-        tags.extend(['ram', 'memory', 'ddr'])
-        
+        ddr_tags = ()
         if item.get('specifications'):
             specs = item['specifications']
             if 'type' in specs:
                 ram_type = specs['type'].upper()
                 if 'DDR4' in ram_type:
-                    tags.append('ddr4')
+                    ddr_tags = ('ddr4',)
                 elif 'DDR5' in ram_type:
-                    tags.append('ddr5')
+                    ddr_tags = ('ddr5',)
         
-        item['tags'] = tags
+        item['tags'] = list(dict.fromkeys((*(item.get('tags') or ()), *_RAM_TAGS, *ddr_tags)))
 
 
 class AllHardwareSpider(BaseHardwareSpider):
@@ -160,82 +164,52 @@ class AllHardwareSpider(BaseHardwareSpider):
     
     name = "all_hardware"
     
+    _SPIDER_MAPPING = {
+        'GPUHardwareSpider': GPUHardwareSpider,
+        'CPUHardwareSpider': CPUHardwareSpider,
+        'RAMHardwareSpider': RAMHardwareSpider
+    }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One instance per specialized spider, shared by all its responses
+        self._spiders = {}
+    
+    def _get_spider(self, spider_class_name):
+        """Specialized spider instance for a class name, created on first use"""
+        spider = self._spiders.get(spider_class_name)
+        if spider is None:
+            spider = self._spiders[spider_class_name] = self._SPIDER_MAPPING[spider_class_name]()
+        return spider
+    
     def start_requests(self):
         """Start requests by delegating to specialized spiders"""
-        spider_classes = [
-            GPUHardwareSpider,
-            CPUHardwareSpider,
-            RAMHardwareSpider
-        ]
-        
-        for spider_class in spider_classes:
+        for spider_class_name in self._SPIDER_MAPPING:
             try:
-                spider = spider_class()
+                spider = self._get_spider(spider_class_name)
                 for url in spider.start_urls:
                     yield scrapy.Request(
                         url,
                         callback=self.parse_delegated,
-                        meta={'spider_class': spider_class.__name__}
+                        meta={'spider_class': spider_class_name}
                     )
             except Exception as e:
-                self.logger.error(f"Failed to initialize {spider_class.__name__}: {e}")
+                self.logger.error(f"Failed to initialize {spider_class_name}: {e}")
     
     def parse_delegated(self, response):
         """Parse by delegating to the appropriate spider"""
         spider_class_name = response.meta.get('spider_class')
         
-        spider_mapping = {
-            'GPUHardwareSpider': GPUHardwareSpider,
-            'CPUHardwareSpider': CPUHardwareSpider,
-            'RAMHardwareSpider': RAMHardwareSpider
-        }
-        
-        if spider_class_name in spider_mapping:
-            spider_class = spider_mapping[spider_class_name]
-            spider = spider_class()
+        if spider_class_name in self._SPIDER_MAPPING:
+            spider = self._get_spider(spider_class_name)
             
-            # Get product links using the specialized spider's selectors
-            product_links = response.css(spider.selectors['product_links']).xpath('@href').getall()
+            # Get product links using the specialized spider's selectors,
+            # already translated to XPath when the spider was created
+            product_links = spider.select(response, spider.selectors['product_links']).xpath('@href').getall()
             
             for link in product_links:
-                from urllib.parse import urljoin
                 full_url = urljoin(response.url, link)
-                yield scrapy.Request(
-                    full_url,
-                    callback=self.parse_product_delegated,
-                    meta={
-                        'crawl_id': self.crawl_id,
-                        'spider_class_name': spider_class_name,
-                        'spider': spider
-                    }
-                )
+                # Straight to the specialized spider's parser, no dispatch hop
+                yield scrapy.Request(full_url, callback=spider.parse_product)
         else:
             self.logger.warning(f"Unknown spider class: {spider_class_name}")
-    
-    def parse_product_delegated(self, response):
-        """Parse product with the appropriate specialized spider logic"""
-        spider_class_name = response.meta.get('spider_class_name')
-        spider = response.meta.get('spider')
-        
-        if not spider or not spider_class_name:
-            self.logger.error("Missing spider information in delegation")
-            return
-        
-        spider_mapping = {
-            'GPUHardwareSpider': GPUHardwareSpider,
-            'CPUHardwareSpider': CPUHardwareSpider,
-            'RAMHardwareSpider': RAMHardwareSpider
-        }
-        
-        if spider_class_name in spider_mapping:
-            # Use the specialized spider's parse_product method
-            item = spider.parse_product(response)
-            
-            # If parse_product yields items, yield them
-            if item:
-                if hasattr(item, '__iter__'):
-                    yield from item
-                else:
-                    yield item
-        else:
-            self.logger.warning(f"Unknown spider class in product parsing: {spider_class_name}")
\ No newline at end of file
@@ -0,0 +1,127 @@
+import functools
+import sqlite3
+import subprocess
+import sys
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+LISTING = """<html><body>
+<a href="/product/1.html">GPU 1</a>
+<a href="/product/2.html">GPU 2</a>
+</body></html>"""
+
+PRODUCT = """<html><body>
+<h1 class="product-title">Test Graphics Card {n}</h1>
+<span class="price">$499.99</span>
+<div class="availability">In Stock</div>
+</body></html>"""
+
+# Runs in a fresh interpreter: the Twisted reactor can only be started once
+CRAWL_SCRIPT = """
+import sys
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from hardware_tracker.spiders.base_spider import BaseHardwareSpider
+
+class SmokeSpider(BaseHardwareSpider):
+    name = 'smoke_hardware'
+    start_urls = [sys.argv[1]]
+
+settings = get_project_settings()
+settings.set('DATABASE_URL', sys.argv[2])
+settings.set('LOG_FILE', None)
+settings.set('FEEDS', {})
+process = CrawlerProcess(settings)
+process.crawl(SmokeSpider)
+process.start()
+"""
+
+# Same crawl with the local server throttled by EthicalDownloaderMiddleware.
+# The middleware is imported before the crawler starts, so this also fails if
+# importing it installs a reactor. Any warning fails the crawl, except the
+# newer-Scrapy notices about spider arguments and RANDOMIZE_DOWNLOAD_DELAY,
+# which the project keeps while it still supports scrapy 2.11.
+THROTTLED_CRAWL_SCRIPT = """
+import sys
+import warnings
+from hardware_tracker.middlewares import EthicalDownloaderMiddleware, ThrottleState
+
+warnings.simplefilter('error')
+warnings.filterwarnings('ignore', message='.*requires a spider argument')
+warnings.filterwarnings('ignore', message='The RANDOMIZE_DOWNLOAD_DELAY setting is deprecated')
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from hardware_tracker.spiders.base_spider import BaseHardwareSpider
+
+class ThrottledMiddleware(EthicalDownloaderMiddleware):
+    def __init__(self):
+        super().__init__()
+        self.states['127.0.0.1'] = ThrottleState(0.2)
+
+class SmokeSpider(BaseHardwareSpider):
+    name = 'smoke_hardware'
+    start_urls = [sys.argv[1]]
+
+settings = get_project_settings()
+settings.set('DATABASE_URL', sys.argv[2])
+settings.set('LOG_FILE', None)
+settings.set('FEEDS', {})
+settings.set('DOWNLOADER_MIDDLEWARES', {ThrottledMiddleware: 560})
+process = CrawlerProcess(settings)
+process.crawl(SmokeSpider)
+process.start()
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    (root / 'product').mkdir(parents=True)
+    (root / 'index.html').write_text(LISTING)
+    for n in (1, 2):
+        (root / 'product' / f'{n}.html').write_text(PRODUCT.format(n=n))
+
+    server = HTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/index.html'
+    server.shutdown()
+
+
+def run_crawl(script, site, tmp_path):
+    """Run a crawl script against the local site and return the stored product names"""
+    db_path = tmp_path / 'hardware.db'
+    result = subprocess.run(
+        [sys.executable, '-c', script, site, str(db_path)],
+        cwd=tmp_path,
+        env={'PYTHONPATH': str(REPO_ROOT), 'SCRAPY_SETTINGS_MODULE': 'hardware_tracker.settings'},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert 'Traceback' not in result.stderr, result.stderr
+
+    with sqlite3.connect(db_path) as conn:
+        return {name for (name,) in conn.execute("SELECT name FROM hardware_items")}
+
+
+def test_crawl_starts_with_base_spider_settings(site, tmp_path):
+    names = run_crawl(CRAWL_SCRIPT, site, tmp_path)
+    assert names == {'Test Graphics Card 1', 'Test Graphics Card 2'}
+
+
+def test_throttled_crawl_runs_without_warnings(site, tmp_path):
+    names = run_crawl(THROTTLED_CRAWL_SCRIPT, site, tmp_path)
+    assert names == {'Test Graphics Card 1', 'Test Graphics Card 2'}
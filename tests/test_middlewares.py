@@ -0,0 +1,30 @@
+import asyncio
+
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings.default_settings import DOWNLOADER_MIDDLEWARES_BASE
+
+from hardware_tracker import settings
+from hardware_tracker.middlewares import EthicalDownloaderMiddleware
+
+
+def test_first_429_backs_off_domain():
+    mw = EthicalDownloaderMiddleware()
+    request = Request('https://www.newegg.com/p/pl?d=graphics+cards')
+    assert asyncio.run(mw.process_request(request, spider=None)) is None
+
+    state = mw.states['newegg.com']
+    delay_before = state.current_delay()
+
+    response = HtmlResponse(request.url, status=429, request=request)
+    assert mw.process_response(request, response, spider=None) is response
+
+    assert state.rate_limit_count == 1
+    assert state.current_delay() > delay_before
+    assert state.paused_until > request.meta['start_time_mono']
+
+
+def test_sees_responses_before_retry_middleware():
+    # process_response runs from the highest priority down
+    priority = settings.DOWNLOADER_MIDDLEWARES['hardware_tracker.middlewares.EthicalDownloaderMiddleware']
+    retry = DOWNLOADER_MIDDLEWARES_BASE['scrapy.downloadermiddlewares.retry.RetryMiddleware']
+    assert priority > retry
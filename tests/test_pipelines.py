@@ -0,0 +1,102 @@
+import sqlite3
+
+from hardware_tracker.items import HardwareTrackerItem
+from hardware_tracker.pipelines import DatabaseStoragePipeline
+
+
+def make_item(n, **fields):
+    return HardwareTrackerItem(
+        name=f"Test GPU {n}",
+        price=299.99 + n,
+        currency='USD',
+        source_url=f"https://example.com/product/{n}",
+        scraped_timestamp=1700000000.0 + n,
+        **fields,
+    )
+
+
+def run_pipeline(db_path, items, **kwargs):
+    pipeline = DatabaseStoragePipeline(database_url=str(db_path), **kwargs)
+    pipeline.open_spider(spider=None)
+    try:
+        for item in items:
+            pipeline.process_item(item, spider=None)
+    finally:
+        pipeline.close_spider(spider=None)
+    return pipeline
+
+
+def count_rows(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_nameless_item_does_not_drop_its_batch(tmp_path):
+    db_path = tmp_path / 'hardware.db'
+    items = [make_item(n) for n in range(5)]
+    items.append(HardwareTrackerItem(source_url='https://example.com/product/nameless', price=1.0))
+
+    run_pipeline(db_path, items)
+
+    assert count_rows(db_path, 'hardware_items') == 5
+    assert count_rows(db_path, 'price_history') == 5
+
+
+def test_failed_batch_is_retried_row_by_row(tmp_path):
+    db_path = tmp_path / 'hardware.db'
+    pipeline = DatabaseStoragePipeline(database_url=str(db_path))
+    pipeline.open_spider(spider=None)
+    try:
+        for n in range(5):
+            pipeline.process_item(make_item(n), spider=None)
+        # A row that slipped past process_item's checks, straight onto the queue
+        bad_row = tuple(None for _ in pipeline.columns)
+        pipeline._queue.put(('https://example.com/product/bad', bad_row, None))
+    finally:
+        pipeline.close_spider(spider=None)
+
+    assert count_rows(db_path, 'hardware_items') == 5
+    assert count_rows(db_path, 'price_history') == 5
+
+
+def test_writer_survives_non_sqlite_errors(tmp_path, monkeypatch):
+    db_path = tmp_path / 'hardware.db'
+    pipeline = DatabaseStoragePipeline(database_url=str(db_path), batch_size=1)
+    original_flush = pipeline.flush
+    calls = []
+
+    def flaky_flush(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise TypeError("unserializable value")
+        original_flush(items)
+
+    monkeypatch.setattr(pipeline, 'flush', flaky_flush)
+    pipeline.open_spider(spider=None)
+    try:
+        for n in range(3):
+            pipeline.process_item(make_item(n), spider=None)
+    finally:
+        pipeline.close_spider(spider=None)
+
+    assert count_rows(db_path, 'hardware_items') == 2
+
+
+def test_rescrape_keeps_fields_it_lacks(tmp_path):
+    db_path = tmp_path / 'hardware.db'
+    run_pipeline(db_path, [make_item(1, description="Triple-fan card")])
+    run_pipeline(db_path, [make_item(1)])
+
+    with sqlite3.connect(db_path) as conn:
+        description, = conn.execute("SELECT description FROM hardware_items").fetchone()
+    assert description == "Triple-fan card"
+
+
+def test_missing_field_gets_schema_default(tmp_path):
+    db_path = tmp_path / 'hardware.db'
+    item = HardwareTrackerItem(name="Test GPU", source_url="https://example.com/product/1")
+    run_pipeline(db_path, [item])
+
+    with sqlite3.connect(db_path) as conn:
+        currency, = conn.execute("SELECT currency FROM hardware_items").fetchone()
+    assert currency == 'USD'
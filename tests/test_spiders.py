@@ -0,0 +1,78 @@
+from scrapy.http import HtmlResponse
+
+from hardware_tracker.spiders.base_spider import BaseHardwareSpider
+from hardware_tracker.spiders.new import NeweggHardwareSpider
+
+SPEC_TABLE = b"""
+<html><body>
+<table>
+  <tr><th>Brand</th><td>ASUS</td></tr>
+  <tr><th>Memory</th><td>12GB GDDR6X</td></tr>
+  <tr><th><strong>Chipset</strong></th><td>GeForce RTX 4070</td></tr>
+  <tr><th>Model</th><td><a href="/p/tuf">TUF-RTX4070-O12G</a></td></tr>
+</table>
+</body></html>
+"""
+
+
+def html_response(url, body):
+    return HtmlResponse(url, body=body, encoding='utf-8')
+
+
+def test_base_specifications_read_nested_cell_text():
+    spider = BaseHardwareSpider()
+    specs = spider.extract_specifications(html_response('https://example.com/p/1', SPEC_TABLE))
+    assert specs == {
+        'Brand': 'ASUS',
+        'Memory': '12GB GDDR6X',
+        'Chipset': 'GeForce RTX 4070',
+        'Model': 'TUF-RTX4070-O12G',
+    }
+
+
+def test_newegg_specifications_read_nested_cell_text():
+    body = SPEC_TABLE.replace(b'<table>', b'<div class="product-specs"><table>').replace(
+        b'</table>', b'</table></div>')
+    spider = NeweggHardwareSpider()
+    specs = spider.extract_newegg_specifications(html_response('https://www.newegg.com/p/1', body))
+    assert specs == {
+        'Brand': 'ASUS',
+        'Memory': '12GB GDDR6X',
+        'Chipset': 'GeForce RTX 4070',
+        'Model': 'TUF-RTX4070-O12G',
+    }
+
+
+def test_newegg_part_number_inside_link():
+    body = b"""
+    <html><body><div class="product-specs"><table>
+      <tr><th>Brand</th><td>ASUS</td></tr>
+      <tr><th>Model</th><td><a href="/p/tuf">TUF-RTX4070-O12G</a></td></tr>
+    </table></div></body></html>
+    """
+    spider = NeweggHardwareSpider()
+    part_number = spider.extract_newegg_part_number(html_response('https://www.newegg.com/p/1', body))
+    assert part_number == 'TUF-RTX4070-O12G'
+
+
+def test_newegg_review_count_only_in_rating_text():
+    body = b"""
+    <html><body>
+      <a class="item-rating" title="Rating + 4.5 stars out of 5"></a>
+      <span class="rating">(1,234)</span>
+    </body></html>
+    """
+    spider = NeweggHardwareSpider()
+    rating = spider.extract_newegg_rating(html_response('https://www.newegg.com/p/1', body))
+    assert rating == {'rating': 4.5, 'count': 1234}
+
+
+def test_newegg_stars_in_rating_text_are_not_a_review_count():
+    body = b"""
+    <html><body>
+      <span class="rating">4 out of 5 eggs</span>
+    </body></html>
+    """
+    spider = NeweggHardwareSpider()
+    rating = spider.extract_newegg_rating(html_response('https://www.newegg.com/p/1', body))
+    assert rating['count'] is None